@@ -0,0 +1,112 @@
+"""
+Integer kernels behind MatchmakingSystem.find_best_matches.
+
+They work on plain int arrays (ELOs and net wins in ELO order) so they can be
+compiled with Numba when it is installed, or ahead of time with mypyc (which
+then takes precedence). Otherwise they run as ordinary Python; all three give
+identical results.
+"""
+import heapq
+import inspect
+from itertools import combinations
+from typing import Any, Callable, List, Optional, Sequence, Tuple, TypeVar
+
+_F = TypeVar('_F', bound=Callable[..., Any])
+
+_numba_njit: Optional[Callable[..., Any]]
+try:
+    from numba import njit as _numba_njit  # type: ignore[import-not-found, unused-ignore]
+except ImportError:  # Numba is optional
+    _numba_njit = None
+
+
+def njit(**kwargs: Any) -> Callable[[_F], _F]:
+    """
+    numba.njit when Numba is installed, else leave the function uncompiled.
+    Also left alone when this module is compiled with mypyc: Numba can only
+    JIT plain Python functions, and mypyc has already compiled it.
+    """
+    def decorator(func: _F) -> _F:
+        if _numba_njit is None or not inspect.isfunction(func):
+            return func
+        compiled: _F = _numba_njit(**kwargs)(func)
+        return compiled
+    return decorator
+
+# Every way to pick team 1 out of a 10-player match. Position 0 always goes to
+# team 1 so each 5v5 split appears once: C(9, 4) = 126 splits.
+TEAM_SPLITS: Tuple[Tuple[int, int, int, int, int], ...] = tuple(
+    (0,) + rest for rest in combinations(range(1, 10), 4)
+)
+
+
+@njit(cache=True)
+def best_split(nets: Sequence[int], start: int) -> Tuple[int, int, int]:
+    """
+    Find the most balanced 5v5 split of nets[start:start + 10].
+    Returns (mask, sum1, sum2): bit k of mask is set if player start + k is
+    on team 1, and sum1 / sum2 are the two teams' total net wins.
+    """
+    # Every split is tried, so the window needs no ordering by net_wins first
+    total = 0
+    for k in range(10):
+        total += nets[start + k]
+
+    # Team 1 sums to s1 and team 2 to total - s1, so minimize |2*s1 - total|.
+    # That can't go below total's parity, so stop as soon as it's reached.
+    best = 0
+    best_sum1 = 0
+    best_diff = -1
+    for s in range(len(TEAM_SPLITS)):
+        a, b, c, d, e = TEAM_SPLITS[s]
+        sum1 = (nets[start + a] + nets[start + b] + nets[start + c]
+                + nets[start + d] + nets[start + e])
+        diff = abs(2 * sum1 - total)
+        if best_diff < 0 or diff < best_diff:
+            best_diff = diff
+            best_sum1 = sum1
+            best = s
+            if best_diff == total % 2:
+                break
+
+    mask = 0
+    for k in TEAM_SPLITS[best]:
+        mask |= 1 << k
+
+    return mask, best_sum1, total - best_sum1
+
+
+@njit(cache=True)
+def find_best_windows(elos: Sequence[int], nets: Sequence[int],
+                      max_elo_distance: int, k: int,
+                      start_ranges: Sequence[int]) -> List[Tuple[int, int, int]]:
+    """
+    Find the (up to) k windows of 10 consecutive players (by ELO) within
+    max_elo_distance whose best splits are most balanced, trying only window
+    starts in the ascending [lo, hi) pairs flattened into start_ranges.
+    Returns them unordered as (-diff, -start, mask) heap entries, where diff
+    is |sum1 - sum2| and mask is as from best_split; sorting them in reverse
+    puts the best window first, earlier windows winning ties.
+    """
+    # Bounded min-heap whose root is the worst window kept so far. Seeded and
+    # emptied so Numba can infer the entry type.
+    heap = [(0, 0, 0)]
+    heap.pop()
+
+    for r in range(0, len(start_ranges), 2):
+        for i in range(start_ranges[r], min(start_ranges[r + 1], len(elos) - 9)):
+            # Sorted, so the window's ELO range is just its last minus its first
+            if elos[i + 9] - elos[i] > max_elo_distance:
+                continue
+
+            mask, sum1, sum2 = best_split(nets, i)
+            entry = (-abs(sum1 - sum2), -i, mask)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heappushpop(heap, entry)
+            # k perfectly balanced matches can't be beaten
+            if len(heap) == k and heap[0][0] == 0:
+                return heap
+
+    return heap
@@ -1,7 +1,15 @@
-from typing import List, Tuple, Optional
+import bisect
+from array import array
+from operator import attrgetter
+from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 
-@dataclass
+from _kernel import best_split, find_best_windows
+
+# C-implemented sort key, avoiding a Python-level lambda call per player
+_BY_ELO = attrgetter('elo')
+
+@dataclass(slots=True)
 class Player:
     """Represents a player in the matchmaking system"""
     id: int
@@ -9,29 +17,38 @@ class Player:
     net_wins: int  # wins - losses from last 10 matches (-10 to +10)
     join_time: float
     
-    def __repr__(self):
+    def __repr__(self) -> str:
         return f"Player(id={self.id}, elo={self.elo}, net={self.net_wins:+d})"
-    
-    def __hash__(self):
-        """Make Player hashable based on ID"""
-        return hash(self.id)
-    
-    def __eq__(self, other):
-        """Players are equal if they have the same ID"""
-        if not isinstance(other, Player):
-            return False
-        return self.id == other.id
 
 
 class MatchmakingSystem:
     """FPS Game Matchmaking System"""
     
-    def __init__(self, max_elo_distance: int = 200):
-        self.queue: List[Player] = []
+    def __init__(self, max_elo_distance: int = 200, verbose: bool = True):
+        # Players waiting for a match, keyed by ID (dicts keep arrival order)
+        self.queue_by_id: Dict[int, Player] = {}
+        # Same players kept ordered by (elo, id) so searches never re-sort,
+        # stored as parallel int arrays rather than a list of Player objects
+        self._sorted_elos = array('i')
+        self._sorted_ids = array('q')
+        self._sorted_nets = array('i')
+        # False only when no 10-player window can fit max_elo_distance
+        self._match_possible = False
         self.max_elo_distance = max_elo_distance
+        # Queue size per ELO bin as wide as max_elo_distance: a valid window
+        # always fits inside two adjacent bins
+        self._bin_width = max(max_elo_distance, 1)
+        self._bin_counts: Dict[int, int] = {}
+        # Print joins, failed attempts and match details as they happen
+        self.verbose = verbose
         self.current_time = 0.0
         self.match_count = 0
         self.player_id_counter = 0
+    
+    @property
+    def queue(self) -> List[Player]:
+        """Players currently waiting, in arrival order"""
+        return list(self.queue_by_id.values())
         
     def add_player(self, elo: int, net_wins: int, arrival_time: float) -> Player:
         """Add a player to the queue"""
@@ -42,11 +59,26 @@ class MatchmakingSystem:
             join_time=arrival_time
         )
         self.player_id_counter += 1
-        self.queue.append(player)
+        self.queue_by_id[player.id] = player
+        # New IDs are the largest yet, so ties on ELO land after existing players
+        idx = bisect.bisect_right(self._sorted_elos, elo)
+        self._sorted_elos.insert(idx, elo)
+        self._sorted_ids.insert(idx, player.id)
+        self._sorted_nets.insert(idx, net_wins)
+        bin_idx = elo // self._bin_width
+        self._bin_counts[bin_idx] = self._bin_counts.get(bin_idx, 0) + 1
         self.current_time = arrival_time
         
-        print(f"\n[Time {self.current_time:.2f}s] {player} joined queue")
-        print(f"Queue size: {len(self.queue)}")
+        # Any window that just became feasible must contain the new player
+        elos = self._sorted_elos
+        for start in range(max(0, idx - 9), min(idx, len(elos) - 10) + 1):
+            if elos[start + 9] - elos[start] <= self.max_elo_distance:
+                self._match_possible = True
+                break
+        
+        if self.verbose:
+            print(f"\n[Time {self.current_time:.2f}s] {player} joined queue")
+            print(f"Queue size: {len(self.queue_by_id)}")
         
         return player
     
@@ -60,28 +92,21 @@ class MatchmakingSystem:
         
         return elo_range <= self.max_elo_distance
     
-    def balance_teams(self, players: List[Player]) -> Tuple[List[Player], List[Player]]:
+    def balance_teams(self, players: List[Player]) -> Tuple[List[Player], List[Player], int, int]:
         """
         Balance teams to minimize the difference in average net_wins between teams.
-        Uses a greedy approach with sorting.
+        Tries every 5v5 split of the 10 players and keeps the best one.
+        Returns (team1, team2, team1 net_wins total, team2 net_wins total).
         """
-        # Sort players by net_wins (descending)
-        sorted_players = sorted(players, key=lambda p: p.net_wins, reverse=True)
-        
-        team1 = []
-        team2 = []
-        sum1 = 0
-        sum2 = 0
-        
-        # Greedy assignment: assign each player to the team with lower sum
-        for player in sorted_players:
-            if len(team1) < 5 and (len(team2) == 5 or sum1 <= sum2):
-                team1.append(player)
-                sum1 += player.net_wins
-            else:
-                team2.append(player)
-                sum2 += player.net_wins
-        
+        mask, sum1, sum2 = best_split(array('i', [p.net_wins for p in players]), 0)
+        team1, team2 = self._split_teams(players, mask)
+        return team1, team2, sum1, sum2
+    
+    @staticmethod
+    def _split_teams(players: List[Player], mask: int) -> Tuple[List[Player], List[Player]]:
+        """Split players into (team1, team2) by a best_split team-1 bitmask"""
+        team1 = [p for k, p in enumerate(players) if mask >> k & 1]
+        team2 = [p for k, p in enumerate(players) if not mask >> k & 1]
         return team1, team2
     
     def find_best_match(self) -> Optional[Tuple[List[Player], List[Player]]]:
@@ -89,81 +114,117 @@ class MatchmakingSystem:
         Find the best 10 players for a match that satisfy all criteria.
         Returns two balanced teams or None if no match is possible.
         """
-        if len(self.queue) < 10:
-            return None
-        
-        # Sort queue by ELO for easier searching
-        sorted_queue = sorted(self.queue, key=lambda p: p.elo)
-        
-        # Try different combinations of 10 players within ELO range
-        best_match = None
-        best_balance = float('inf')
-        
-        # Use sliding window approach to find players within ELO range
-        for i in range(len(sorted_queue) - 9):
-            candidate_players = []
-            
-            for j in range(i, len(sorted_queue)):
-                if len(candidate_players) == 10:
-                    break
-                    
-                if not candidate_players or \
-                   (sorted_queue[j].elo - candidate_players[0].elo <= self.max_elo_distance):
-                    candidate_players.append(sorted_queue[j])
-            
-            # Check if we have exactly 10 players within ELO range
-            if len(candidate_players) == 10 and self.check_elo_compatibility(candidate_players):
-                team1, team2 = self.balance_teams(candidate_players)
-                
-                # Calculate balance score
-                avg1 = sum(p.net_wins for p in team1) / 5
-                avg2 = sum(p.net_wins for p in team2) / 5
-                balance_score = abs(avg1 - avg2)
-                
-                if balance_score < best_balance:
-                    best_balance = balance_score
-                    best_match = (team1, team2)
-        
-        return best_match
+        matches = self.find_best_matches(1)
+        return matches[0] if matches else None
+    
+    def find_best_matches(self, k: int) -> List[Tuple[List[Player], List[Player]]]:
+        """
+        Find up to k candidate matches (e.g. to offer for review), best first.
+        Candidates come from different ELO windows and may share players.
+        """
+        # Only now build Player objects, for the windows that were kept
+        return [
+            self._split_teams(self._window_players(start), mask)
+            for start, mask in self._find_best_windows(k)
+        ]
+    
+    def _find_best_windows(self, k: int) -> List[Tuple[int, int]]:
+        """
+        Find up to k (start, team-1 bitmask) windows into the ELO-sorted arrays,
+        best first
+        """
+        if len(self.queue_by_id) < 10 or k < 1:
+            return []
+        
+        # A window starting in some bin lies within it and the next one, so
+        # only starts in bins that hold 10 players together with the next
+        # one are worth scanning. Runs of such bins (among occupied bins)
+        # become [lo, hi) index ranges, bisected once per run.
+        elos = self._sorted_elos
+        counts = self._bin_counts
+        width = self._bin_width
+        start_ranges = array('q')
+        run_first: Optional[int] = None
+        for bin_idx in sorted(counts) + [None]:
+            if bin_idx is not None and counts[bin_idx] + counts.get(bin_idx + 1, 0) >= 10:
+                if run_first is None:
+                    run_first = bin_idx
+                run_last = bin_idx
+            elif run_first is not None:
+                lo = bisect.bisect_left(elos, run_first * width)
+                start_ranges.extend((lo, bisect.bisect_left(elos, (run_last + 1) * width, lo)))
+                run_first = None
+        
+        # Sliding window over the ELO-sorted arrays, balancing each window
+        heap = find_best_windows(
+            elos, self._sorted_nets, self.max_elo_distance, k, start_ranges
+        )
+        return [(-neg_start, mask) for _, neg_start, mask in sorted(heap, reverse=True)]
+    
+    def _window_players(self, start: int) -> List[Player]:
+        """The 10 players at start:start + 10 of the ELO-sorted arrays"""
+        return [self.queue_by_id[pid] for pid in self._sorted_ids[start:start + 10]]
     
     def create_match(self) -> bool:
         """
         Attempt to create a match from the current queue.
         Returns True if a match was created, False otherwise.
         """
-        match = self.find_best_match()
+        windows = self._find_best_windows(1) if self._match_possible else []
         
-        if match is None:
-            print(f"[Time {self.current_time:.2f}s] Cannot create match - criteria not met")
+        if not windows:
+            self._match_possible = False
+            if self.verbose:
+                print(f"[Time {self.current_time:.2f}s] Cannot create match - criteria not met")
             return False
         
-        team1, team2 = match
+        # Keep the window's position so its players can be cut out in one go
+        start, mask = windows[0]
+        players = self._window_players(start)
+        team1, team2 = self._split_teams(players, mask)
         self.match_count += 1
         
         # Remove matched players from queue
-        matched_players = set(team1 + team2)
-        self.queue = [p for p in self.queue if p not in matched_players]
+        for player in players:
+            del self.queue_by_id[player.id]
+            bin_idx = player.elo // self._bin_width
+            self._bin_counts[bin_idx] -= 1
+            if not self._bin_counts[bin_idx]:
+                del self._bin_counts[bin_idx]
+        del self._sorted_elos[start:start + 10]
+        del self._sorted_ids[start:start + 10]
+        del self._sorted_nets[start:start + 10]
+        
+        # The players left behind may still hold another valid window, but
+        # only if some pair of adjacent bins holds at least 10 of them
+        counts = self._bin_counts
+        self._match_possible = any(
+            count + counts.get(bin_idx + 1, 0) >= 10 for bin_idx, count in counts.items()
+        )
         
         # Display match info
-        print(f"\n{'='*70}")
-        print(f"[Time {self.current_time:.2f}s] MATCH #{self.match_count} CREATED!")
-        print(f"{'='*70}")
-        
-        self._display_team("TEAM 1", team1)
-        self._display_team("TEAM 2", team2)
-        
-        print(f"\nRemaining in queue: {len(self.queue)}")
-        print(f"{'='*70}\n")
+        if self.verbose:
+            print(f"\n{'='*70}")
+            print(f"[Time {self.current_time:.2f}s] MATCH #{self.match_count} CREATED!")
+            print(f"{'='*70}")
+            
+            self._display_team("TEAM 1", team1)
+            self._display_team("TEAM 2", team2)
+            
+            print(f"\nRemaining in queue: {len(self.queue_by_id)}")
+            print(f"{'='*70}\n")
         
         return True
     
-    def _display_team(self, team_name: str, team: List[Player]):
+    def _display_team(self, team_name: str, team: List[Player]) -> None:
         """Display team information"""
         print(f"\n{team_name}:")
         total_elo = 0
         total_net = 0
         
-        for player in sorted(team, key=lambda p: p.elo, reverse=True):
+        # Sorted by ELO (descending), so the range is just the two ends
+        sorted_team = sorted(team, key=_BY_ELO, reverse=True)
+        for player in sorted_team:
             wait_time = self.current_time - player.join_time
             print(f"  {player} | Wait: {wait_time:.2f}s")
             total_elo += player.elo
@@ -174,5 +235,5 @@ class MatchmakingSystem:
         
         print(f"  Average ELO: {avg_elo:.1f}")
         print(f"  Average Net Wins: {avg_net:.2f}")
-        print(f"  ELO Range: {min(p.elo for p in team)} - {max(p.elo for p in team)}")
+        print(f"  ELO Range: {sorted_team[-1].elo} - {sorted_team[0].elo}")
 
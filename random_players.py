@@ -1,4 +1,5 @@
 import random
+from operator import itemgetter
 from typing import Optional
 
 from matchmaking import MatchmakingSystem
@@ -7,8 +8,9 @@ def simulate_matchmaking(
     num_players: int = 50,
     max_time: float = 300.0,
     max_elo_distance: int = 200,
-    seed: Optional[int] = None
-):
+    seed: Optional[int] = None,
+    verbose: bool = True
+) -> MatchmakingSystem:
     """
     Simulate a matchmaking system with players arriving at random times.
     
@@ -17,12 +19,14 @@ def simulate_matchmaking(
         max_time: Maximum simulation time in seconds
         max_elo_distance: Maximum ELO difference allowed in a match
         seed: Random seed for reproducibility
+        verbose: Print every join and match; the summary is always printed
     """
-    if seed is not None:
-        random.seed(seed)
+    # Private generator: same sequence as seeding the global one, without
+    # touching the caller's random state
+    rng = random.Random(seed)
     
     # Initialize matchmaking system
-    mm_system = MatchmakingSystem(max_elo_distance=max_elo_distance)
+    mm_system = MatchmakingSystem(max_elo_distance=max_elo_distance, verbose=verbose)
     
     print("="*70)
     print("FPS MATCHMAKING SIMULATION")
@@ -32,16 +36,17 @@ def simulate_matchmaking(
     print(f"Max simulation time: {max_time}s")
     print("="*70)
     
-    # Generate player arrival events
-    events = []
-    for i in range(num_players):
-        arrival_time = random.uniform(0, max_time)
-        elo = random.randint(1000, 3000)
-        net_wins = random.randint(-10, 10)
-        events.append((arrival_time, elo, net_wins))
+    # Generate player arrival events. randrange(a, b + 1) is what randint(a, b)
+    # calls, and tuple items are drawn left to right, so seeds are unaffected
+    uniform = rng.uniform
+    randrange = rng.randrange
+    events = [
+        (uniform(0, max_time), randrange(1000, 3001), randrange(-10, 11))
+        for _ in range(num_players)
+    ]
     
     # Sort events by arrival time
-    events.sort(key=lambda x: x[0])
+    events.sort(key=itemgetter(0))
     
     # Process events
     for arrival_time, elo, net_wins in events:
@@ -74,5 +79,6 @@ if __name__ == "__main__":
         num_players=int(player_join_rate*max_simulation_time/60),
         max_time=max_simulation_time,
         max_elo_distance=200,
-        seed=42
+        seed=42,
+        verbose=False
     )
\ No newline at end of file